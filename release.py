@@ -4,13 +4,16 @@ Aerodrome Registry Release Tool
 
 Promotes staging version to production after manual review and approval.
 """
-import json
+import os
 import shutil
 import sys
 import subprocess
 from datetime import datetime
 from pathlib import Path
 
+import ijson
+import orjson
+
 def get_current_version() -> str:
     """Get current version from VERSION file."""
     try:
@@ -139,42 +142,59 @@ def backup_production(prod_file: str = 'aerodromes.json') -> str:
     return backup_file
 
 def validate_staging(staging_file: str = 'aerodromes-staging.json') -> bool:
-    """Validate staging file before promotion."""
+    """Validate staging file before promotion, streaming it to avoid loading every aerodrome."""
     try:
-        with open(staging_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        top_level_fields = set()
+        total_count = None
+        aerodromes_is_list = False
+        aerodrome_count = 0
+        sample_fields = set()
+        
+        with open(staging_file, 'rb') as f:
+            for prefix, event, value in ijson.parse(f):
+                if prefix == '' and event == 'map_key':
+                    top_level_fields.add(value)
+                elif prefix == 'total_count':
+                    total_count = value
+                elif prefix == 'aerodromes' and event == 'start_array':
+                    aerodromes_is_list = True
+                elif prefix == 'aerodromes.item':
+                    # Each item opens with exactly one event that is not a key or closing event
+                    if event not in ('map_key', 'end_map', 'end_array'):
+                        aerodrome_count += 1
+                    elif event == 'map_key' and aerodrome_count == 1:
+                        sample_fields.add(value)
         
         # Basic validation
         required_fields = ['version', 'last_updated', 'total_count', 'aerodromes']
         for field in required_fields:
-            if field not in data:
+            if field not in top_level_fields:
                 print(f"❌ Missing required field: {field}")
                 return False
         
-        if not isinstance(data['aerodromes'], list):
+        if not aerodromes_is_list:
             print("❌ Aerodromes must be a list")
             return False
         
-        if data['total_count'] != len(data['aerodromes']):
-            print(f"❌ Count mismatch: total_count={data['total_count']}, actual={len(data['aerodromes'])}")
+        if total_count != aerodrome_count:
+            print(f"❌ Count mismatch: total_count={total_count}, actual={aerodrome_count}")
             return False
         
         # Sample aerodrome validation
-        if data['aerodromes']:
-            sample = data['aerodromes'][0]
+        if aerodrome_count:
             required_aerodrome_fields = ['icao', 'name', 'country', 'timezone']
             for field in required_aerodrome_fields:
-                if field not in sample:
+                if field not in sample_fields:
                     print(f"❌ Missing aerodrome field: {field}")
                     return False
         
-        print(f"✅ Staging validation passed: {len(data['aerodromes'])} aerodromes")
+        print(f"✅ Staging validation passed: {aerodrome_count} aerodromes")
         return True
         
     except FileNotFoundError:
         print(f"❌ Staging file not found: {staging_file}")
         return False
-    except json.JSONDecodeError as e:
+    except ijson.JSONError as e:
         print(f"❌ Invalid JSON in staging file: {e}")
         return False
 
@@ -227,18 +247,20 @@ def release_to_production(staging_file: str = 'aerodromes-staging.json',
         if backup_file:
             print(f"💾 Production backup created: {backup_file}")
         
-        # Promote staging to production
-        shutil.copy2(staging_file, prod_file)
-        
-        # Update production metadata
-        with open(prod_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        # Promote staging to production in a single read and write
+        data = orjson.loads(Path(staging_file).read_bytes())
         
         # Add release timestamp
         data['released_at'] = datetime.now().strftime('%Y-%m-%dT%H:%M:%S%z')
         
-        with open(prod_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        # Write to a temporary file and swap it in atomically
+        tmp_file = f"{prod_file}.tmp"
+        try:
+            Path(tmp_file).write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+            os.replace(tmp_file, prod_file)
+        except Exception:
+            Path(tmp_file).unlink(missing_ok=True)
+            raise
         
         print("✅ Release completed successfully!")
         print(f"📊 Released {data['total_count']} aerodromes to production")
@@ -263,8 +285,14 @@ def rollback_production(backup_pattern: str = None) -> bool:
         print("❌ No backups directory found")
         return False
     
-    # Find available backups
-    backups = sorted(backups_dir.glob("aerodromes_backup_*.json"), reverse=True)
+    # Find available backups with a single directory scan
+    with os.scandir(backups_dir) as entries:
+        backups = sorted(
+            (entry for entry in entries
+             if entry.name.startswith('aerodromes_backup_') and entry.name.endswith('.json')),
+            key=lambda entry: entry.name,
+            reverse=True
+        )
     if not backups:
         print("❌ No backup files found")
         return False
@@ -295,7 +323,7 @@ def rollback_production(backup_pattern: str = None) -> bool:
             return False
         
         # Perform rollback
-        shutil.copy2(selected_backup, 'aerodromes.json')
+        shutil.copy2(selected_backup.path, 'aerodromes.json')
         print(f"✅ Rolled back to {selected_backup.name}")
         return True
         
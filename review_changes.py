@@ -5,28 +5,66 @@ Aerodrome Registry Change Review Tool
 Compares staging vs production versions and shows detailed changes
 for manual review before release.
 """
-import json
 import sys
 from datetime import datetime
+from pathlib import Path
 from typing import Dict, List, Set, Tuple
 
+import orjson
+
 def load_json(filename: str) -> Dict:
     """Load and parse JSON file."""
     try:
-        with open(filename, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return orjson.loads(Path(filename).read_bytes())
     except FileNotFoundError:
         print(f"⚠️  File {filename} not found")
         return {}
-    except json.JSONDecodeError as e:
+    except orjson.JSONDecodeError as e:
         print(f"❌ Error parsing {filename}: {e}")
         return {}
 
-def get_aerodrome_dict(data: Dict) -> Dict[str, Dict]:
-    """Convert aerodrome list to dictionary keyed by ICAO code."""
+def get_sorted_aerodromes(data: Dict) -> List[Dict]:
+    """Return aerodrome list sorted by ICAO code, keeping the last entry for duplicate codes."""
     if not data or 'aerodromes' not in data:
-        return {}
-    return {a['icao']: a for a in data['aerodromes']}
+        return []
+    
+    # Registry files are written sorted, so this is a linear pass in practice
+    aerodromes = []
+    for aerodrome in sorted(data['aerodromes'], key=lambda a: a['icao']):
+        if aerodromes and aerodromes[-1]['icao'] == aerodrome['icao']:
+            aerodromes[-1] = aerodrome
+        else:
+            aerodromes.append(aerodrome)
+    return aerodromes
+
+def diff_aerodromes(prod_aerodromes: List[Dict],
+                    staging_aerodromes: List[Dict]) -> Tuple[List[Dict], List[Dict], List[Tuple[Dict, Dict]]]:
+    """Merge-walk two ICAO-sorted aerodrome lists and return (new, removed, changed)."""
+    new_aerodromes = []
+    removed_aerodromes = []
+    changed_aerodromes = []
+    
+    i = j = 0
+    while i < len(prod_aerodromes) and j < len(staging_aerodromes):
+        prod_aerodrome = prod_aerodromes[i]
+        staging_aerodrome = staging_aerodromes[j]
+        
+        if prod_aerodrome['icao'] < staging_aerodrome['icao']:
+            removed_aerodromes.append(prod_aerodrome)
+            i += 1
+        elif prod_aerodrome['icao'] > staging_aerodrome['icao']:
+            new_aerodromes.append(staging_aerodrome)
+            j += 1
+        else:
+            if prod_aerodrome != staging_aerodrome:
+                changed_aerodromes.append((prod_aerodrome, staging_aerodrome))
+            i += 1
+            j += 1
+    
+    removed_aerodromes.extend(prod_aerodromes[i:])
+    new_aerodromes.extend(staging_aerodromes[j:])
+    
+    return new_aerodromes, removed_aerodromes, changed_aerodromes
 
 def compare_aerodromes(prod_file: str = 'aerodromes.json', 
                       staging_file: str = 'aerodromes-staging.json') -> None:
@@ -44,11 +82,10 @@ def compare_aerodromes(prod_file: str = 'aerodromes.json',
         print("❌ No staging data found. Run sync first.")
         return
     
-    prod_aerodromes = get_aerodrome_dict(prod_data)
-    staging_aerodromes = get_aerodrome_dict(staging_data)
+    prod_aerodromes = get_sorted_aerodromes(prod_data)
+    staging_aerodromes = get_sorted_aerodromes(staging_data)
     
-    prod_icaos = set(prod_aerodromes.keys())
-    staging_icaos = set(staging_aerodromes.keys())
+    new_aerodromes, removed_aerodromes, changed_aerodromes = diff_aerodromes(prod_aerodromes, staging_aerodromes)
     
     # Summary statistics
     print(f"📊 Summary:")
@@ -58,51 +95,34 @@ def compare_aerodromes(prod_file: str = 'aerodromes.json',
     print()
     
     # New aerodromes
-    new_icaos = staging_icaos - prod_icaos
-    if new_icaos:
-        print(f"✅ NEW AERODROMES ({len(new_icaos)}):")
-        for icao in sorted(new_icaos)[:10]:  # Show first 10
-            aerodrome = staging_aerodromes[icao]
-            print(f"   + {icao}: {aerodrome['name']} ({aerodrome['country']})")
-        if len(new_icaos) > 10:
-            print(f"   ... and {len(new_icaos) - 10} more")
+    if new_aerodromes:
+        print(f"✅ NEW AERODROMES ({len(new_aerodromes)}):")
+        for aerodrome in new_aerodromes[:10]:  # Show first 10
+            print(f"   + {aerodrome['icao']}: {aerodrome['name']} ({aerodrome['country']})")
+        if len(new_aerodromes) > 10:
+            print(f"   ... and {len(new_aerodromes) - 10} more")
         print()
     
     # Removed aerodromes
-    removed_icaos = prod_icaos - staging_icaos
-    if removed_icaos:
-        print(f"❌ REMOVED AERODROMES ({len(removed_icaos)}):")
-        for icao in sorted(removed_icaos)[:10]:  # Show first 10
-            aerodrome = prod_aerodromes[icao]
-            print(f"   - {icao}: {aerodrome['name']} ({aerodrome['country']})")
-        if len(removed_icaos) > 10:
-            print(f"   ... and {len(removed_icaos) - 10} more")
+    if removed_aerodromes:
+        print(f"❌ REMOVED AERODROMES ({len(removed_aerodromes)}):")
+        for aerodrome in removed_aerodromes[:10]:  # Show first 10
+            print(f"   - {aerodrome['icao']}: {aerodrome['name']} ({aerodrome['country']})")
+        if len(removed_aerodromes) > 10:
+            print(f"   ... and {len(removed_aerodromes) - 10} more")
         print()
     
     # Changed aerodromes
-    common_icaos = prod_icaos & staging_icaos
-    changed_icaos = []
-    
-    for icao in common_icaos:
-        prod_aerodrome = prod_aerodromes[icao]
-        staging_aerodrome = staging_aerodromes[icao]
-        
-        if prod_aerodrome != staging_aerodrome:
-            changed_icaos.append(icao)
-    
-    if changed_icaos:
-        print(f"🔄 CHANGED AERODROMES ({len(changed_icaos)}):")
-        for icao in sorted(changed_icaos)[:10]:  # Show first 10
-            prod_aerodrome = prod_aerodromes[icao]
-            staging_aerodrome = staging_aerodromes[icao]
-            
-            print(f"   ~ {icao}: {staging_aerodrome['name']}")
+    if changed_aerodromes:
+        print(f"🔄 CHANGED AERODROMES ({len(changed_aerodromes)}):")
+        for prod_aerodrome, staging_aerodrome in changed_aerodromes[:10]:  # Show first 10
+            print(f"   ~ {staging_aerodrome['icao']}: {staging_aerodrome['name']}")
             for key in ['name', 'country', 'timezone']:
                 if prod_aerodrome.get(key) != staging_aerodrome.get(key):
                     print(f"     {key}: '{prod_aerodrome.get(key)}' → '{staging_aerodrome.get(key)}'")
         
-        if len(changed_icaos) > 10:
-            print(f"   ... and {len(changed_icaos) - 10} more")
+        if len(changed_aerodromes) > 10:
+            print(f"   ... and {len(changed_aerodromes) - 10} more")
         print()
     
     # Version info
@@ -114,7 +134,7 @@ def compare_aerodromes(prod_file: str = 'aerodromes.json',
     print("-" * 60)
     
     # Recommendation
-    total_changes = len(new_icaos) + len(removed_icaos) + len(changed_icaos)
+    total_changes = len(new_aerodromes) + len(removed_aerodromes) + len(changed_aerodromes)
     if total_changes == 0:
         print("✨ No changes detected - staging matches production")
     else:
@@ -122,10 +142,10 @@ def compare_aerodromes(prod_file: str = 'aerodromes.json',
         print(f"💡 To release these changes, run: python3 release.py")
         
         # Warnings for significant changes
-        if len(removed_icaos) > 100:
-            print(f"⚠️  WARNING: {len(removed_icaos)} aerodromes removed - verify this is expected")
-        if len(new_icaos) > 1000:
-            print(f"⚠️  WARNING: {len(new_icaos)} aerodromes added - large data update")
+        if len(removed_aerodromes) > 100:
+            print(f"⚠️  WARNING: {len(removed_aerodromes)} aerodromes removed - verify this is expected")
+        if len(new_aerodromes) > 1000:
+            print(f"⚠️  WARNING: {len(new_aerodromes)} aerodromes added - large data update")
 
 if __name__ == "__main__":
     compare_aerodromes()
@@ -11,77 +11,146 @@ Data Sources:
 - OpenFlights (https://openflights.org) - Open Database License (ODbL)
   Timezone data by OpenFlights.org contributors
 """
+import bisect
 import csv
+import hashlib
 import json
 import os
 import glob
+import shutil
+import urllib.error
 import urllib.request
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, List
+from pathlib import Path
+from typing import Dict, List, TextIO, Tuple
+
+import orjson
+
 from country_timezones import get_fallback_timezone
 
 OURAIRPORTS_URL = "https://davidmegginson.github.io/ourairports-data/airports.csv"
 OPENFLIGHTS_URL = "https://raw.githubusercontent.com/jpatokal/openflights/master/data/airports.dat"
-INVALID_TIMEZONE_VALUES = [r'\N', 'N', '', 'NULL', '\\N']
+CACHE_DIR = '.cache'
+INVALID_TIMEZONE_VALUES = frozenset((r'\N', 'N', '', 'NULL', '\\N'))
 
-def download_data(url: str) -> str:
-    """Download data from URL and return as string."""
+def download_data(url: str) -> Path:
+    """Download data from URL into the local cache and return the cached file path."""
+    cache_key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+    body_file = Path(CACHE_DIR) / f"{cache_key}.body"
+    meta_file = Path(CACHE_DIR) / f"{cache_key}.meta.json"
+    partial_file = body_file.with_suffix('.part')
+    Path(CACHE_DIR).mkdir(exist_ok=True)
+    
+    request = urllib.request.Request(url)
+    if body_file.exists() and meta_file.exists():
+        try:
+            meta = orjson.loads(meta_file.read_bytes())
+        except (OSError, orjson.JSONDecodeError):
+            meta = None
+        if not isinstance(meta, dict):
+            # Treat an unreadable cache entry as a miss and download in full
+            meta = {}
+        if meta.get('etag'):
+            request.add_header('If-None-Match', meta['etag'])
+        if meta.get('last_modified'):
+            request.add_header('If-Modified-Since', meta['last_modified'])
+    
     try:
-        with urllib.request.urlopen(url) as response:
-            return response.read().decode('utf-8')
+        with urllib.request.urlopen(request) as response, open(partial_file, 'wb') as f:
+            shutil.copyfileobj(response, f)
+            meta = {
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified')
+            }
+    except urllib.error.HTTPError as e:
+        partial_file.unlink(missing_ok=True)
+        if e.code == 304 and body_file.exists():
+            print(f"📦 Not modified, using cached copy of {url}")
+            return body_file
+        print(f"Error downloading {url}: {e}")
+        raise
     except Exception as e:
+        partial_file.unlink(missing_ok=True)
         print(f"Error downloading {url}: {e}")
         raise
-
-def extract_icao_code(row: Dict[str, str]) -> str:
-    """Extract valid ICAO code from OurAirports row data."""
-    icao_field = row.get('icao_code', '').strip()
-    ident_field = row.get('ident', '').strip()
     
-    if icao_field and len(icao_field) == 4:
+    os.replace(partial_file, body_file)
+    meta_file.write_bytes(orjson.dumps(meta))
+    return body_file
+
+def extract_icao_code(icao_field: str, ident_field: str) -> str:
+    """Extract valid ICAO code from OurAirports icao_code/ident fields."""
+    icao_field = icao_field.strip()
+    if len(icao_field) == 4:
         return icao_field
-    elif ident_field and len(ident_field) == 4 and ident_field.isalpha():
+    
+    # Only strip the ident when icao_code is unusable
+    ident_field = ident_field.strip()
+    if len(ident_field) == 4 and ident_field.isalpha():
         return ident_field
     return None
 
-def process_ourairports_data(data: str) -> Dict[str, Dict[str, str]]:
-    """Process OurAirports CSV data and extract active airports with valid ICAO codes."""
-    airports = {}
-    reader = csv.DictReader(data.splitlines())
+def process_ourairports_data(stream: TextIO) -> Tuple[Dict[str, int], List[str], List[str]]:
+    """Process OurAirports CSV stream and extract active airports with valid ICAO codes.
+    
+    Airports are returned as parallel lists, with a lookup from ICAO code to list position.
+    """
+    icao_positions = {}
+    names = []
+    country_codes = []
+    reader = csv.reader(stream)
+    
+    # Resolve column positions once from the header row
+    header = next(reader, None)
+    if not header:
+        return icao_positions, names, country_codes
+    
+    columns = {name: index for index, name in enumerate(header)}
+    icao_index = columns['icao_code']
+    ident_index = columns['ident']
+    type_index = columns['type']
+    name_index = columns['name']
+    country_index = columns['iso_country']
     
     for row in reader:
-        if row.get('type', '').strip() == 'closed':
+        # Skip blank lines, as csv.DictReader did
+        if not row:
+            continue
+        
+        if row[type_index].strip() == 'closed':
             continue
             
-        icao = extract_icao_code(row)
+        icao = extract_icao_code(row[icao_index], row[ident_index])
         if icao:
-            airports[icao] = {
-                'name': row.get('name', '').strip(),
-                'country_code': row.get('iso_country', '').strip(),
-                'latitude': float(row.get('latitude_deg', 0)) if row.get('latitude_deg') else 0,
-                'longitude': float(row.get('longitude_deg', 0)) if row.get('longitude_deg') else 0
-            }
+            name = row[name_index].strip()
+            country_code = row[country_index].strip()
+            
+            # Later rows for the same ICAO code replace earlier ones in place
+            position = icao_positions.get(icao)
+            if position is None:
+                icao_positions[icao] = len(names)
+                names.append(name)
+                country_codes.append(country_code)
+            else:
+                names[position] = name
+                country_codes[position] = country_code
     
-    return airports
+    return icao_positions, names, country_codes
 
-def process_openflights_data(data: str) -> Dict[str, str]:
-    """Process OpenFlights data and extract timezone information."""
+def process_openflights_data(stream: TextIO) -> Dict[str, str]:
+    """Process OpenFlights data stream and extract timezone information."""
     timezones = {}
     
-    for line in data.strip().split('\n'):
-        if line.startswith('Airport ID'):
+    for fields in csv.reader(stream):
+        if len(fields) < 12 or fields[0] == 'Airport ID':
             continue
         
-        try:
-            fields = line.split(',')
-            if len(fields) >= 12:
-                icao = fields[5].strip('"')
-                timezone = fields[11].strip('"')
-                
-                if icao and timezone and len(icao) == 4 and timezone not in INVALID_TIMEZONE_VALUES:
-                    timezones[icao] = timezone
-        except (IndexError, ValueError):
-            continue
+        icao = fields[5]
+        timezone = fields[11]
+        
+        if icao and timezone and len(icao) == 4 and timezone not in INVALID_TIMEZONE_VALUES:
+            timezones[icao] = timezone
     
     return timezones
 
@@ -110,55 +179,53 @@ def load_aerodrome_overrides() -> List[Dict[str, str]]:
     
     return overrides
 
-def build_registry(airports: Dict[str, Dict[str, str]], timezones: Dict[str, str], overrides: List[Dict[str, str]] = None) -> List[Dict[str, str]]:
+def build_registry(icao_positions: Dict[str, int], names: List[str], country_codes: List[str], timezones: Dict[str, str], overrides: List[Dict[str, str]] = None) -> List[Dict[str, str]]:
     """Build the final aerodrome registry with timezone assignment, including overrides."""
-    registry = []
     stats = {'matched': 0, 'fallback': 0, 'overrides': 0, 'overridden': 0}
     
     override_lookup = {override['icao']: override for override in (overrides or []) if 'icao' in override}
+    fallback_timezones = {country_code: get_fallback_timezone(country_code) for country_code in set(country_codes)}
     
-    for icao, data in airports.items():
-        if icao in override_lookup:
-            override_data = override_lookup[icao]
+    registry = [
+        {
+            'icao': icao,
+            'name': names[position],
+            'country': country_codes[position],
+            'timezone': timezones.get(icao) or fallback_timezones[country_codes[position]]
+        }
+        # Sort only the ICAO keys; the single-item loop binds the position once per airport
+        for icao in sorted(icao_positions)
+        if icao not in override_lookup
+        for position in [icao_positions[icao]]
+    ]
+    # process_openflights_data never stores empty timezones, so membership means matched
+    stats['matched'] = sum(1 for entry in registry if entry['icao'] in timezones)
+    stats['fallback'] = len(registry) - stats['matched']
+    
+    # Airports already parsed are overridden, any other ICAO code is added as new
+    for icao, override_data in override_lookup.items():
+        position = icao_positions.get(icao)
+        if position is not None:
             entry = {
                 'icao': icao,
-                'name': override_data.get('name', data['name']),
-                'country': override_data.get('country', data['country_code']),
+                'name': override_data.get('name', names[position]),
+                'country': override_data.get('country', country_codes[position]),
                 'timezone': override_data.get('timezone', 'UTC')
             }
             stats['overridden'] += 1
             print(f"🔄 Overriding {icao} with custom data")
         else:
-            timezone = timezones.get(icao)
-            if timezone:
-                stats['matched'] += 1
-            else:
-                timezone = get_fallback_timezone(data['country_code'])
-                stats['fallback'] += 1
-            
             entry = {
                 'icao': icao,
-                'name': data['name'],
-                'country': data['country_code'],
-                'timezone': timezone
-            }
-        
-        registry.append(entry)
-    
-    existing_icaos = {entry['icao'] for entry in registry}
-    for override in (overrides or []):
-        if 'icao' in override and override['icao'] not in existing_icaos:
-            entry = {
-                'icao': override['icao'],
-                'name': override.get('name', ''),
-                'country': override.get('country', ''),
-                'timezone': override.get('timezone', 'UTC')
+                'name': override_data.get('name', ''),
+                'country': override_data.get('country', ''),
+                'timezone': override_data.get('timezone', 'UTC')
             }
-            registry.append(entry)
             stats['overrides'] += 1
-            print(f"➕ Adding new aerodrome {override['icao']} from overrides")
+            print(f"➕ Adding new aerodrome {icao} from overrides")
+        
+        bisect.insort(registry, entry, key=lambda x: x['icao'])
     
-    registry.sort(key=lambda x: x['icao'])
     return registry, stats
 
 def main():
@@ -166,22 +233,27 @@ def main():
     print("🔄 Starting aerodrome registry sync...")
     
     print("📥 Downloading data sources...")
-    ourairports_data = download_data(OURAIRPORTS_URL)
-    openflights_data = download_data(OPENFLIGHTS_URL)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        ourairports_future = executor.submit(download_data, OURAIRPORTS_URL)
+        openflights_future = executor.submit(download_data, OPENFLIGHTS_URL)
+        ourairports_file = ourairports_future.result()
+        openflights_file = openflights_future.result()
     
     print("🔍 Processing OurAirports data...")
-    airports = process_ourairports_data(ourairports_data)
-    print(f"📊 Found {len(airports)} airports with ICAO codes")
+    with open(ourairports_file, 'r', encoding='utf-8', newline='') as f:
+        icao_positions, names, country_codes = process_ourairports_data(f)
+    print(f"📊 Found {len(icao_positions)} airports with ICAO codes")
     
     print("🔍 Processing OpenFlights timezone data...")
-    timezones = process_openflights_data(openflights_data)
+    with open(openflights_file, 'r', encoding='utf-8', newline='') as f:
+        timezones = process_openflights_data(f)
     print(f"📊 Found {len(timezones)} airports with timezone data")
     
     print("📝 Loading aerodrome overrides...")
     overrides = load_aerodrome_overrides()
     
     print("🏗️ Building aerodrome registry...")
-    aerodromes, stats = build_registry(airports, timezones, overrides)
+    aerodromes, stats = build_registry(icao_positions, names, country_codes, timezones, overrides)
     
     try:
         with open('VERSION', 'r') as f:
@@ -197,8 +269,7 @@ def main():
     }
     
     output_file = 'aerodromes-staging.json'
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(registry, f, indent=2, ensure_ascii=False)
+    Path(output_file).write_bytes(orjson.dumps(registry, option=orjson.OPT_INDENT_2))
     
     print("✅ Sync completed successfully!")
     print(f"📈 Total aerodromes: {len(aerodromes)}")
@@ -4,8 +4,9 @@ Validation script for the aerodrome registry.
 Validates aerodromes.json against schema.json
 """
 import json
-import jsonschema
-from jsonschema import validate, ValidationError
+from collections import Counter
+import fastjsonschema
+from fastjsonschema import JsonSchemaValueException
 import sys
 
 def validate_aerodrome_data():
@@ -19,8 +20,9 @@ def validate_aerodrome_data():
         with open('aerodromes.json', 'r') as f:
             data = json.load(f)
             
-        # Validate the data
-        validate(instance=data, schema=schema)
+        # Validate the data (formats are not asserted, matching jsonschema's default behaviour)
+        validate = fastjsonschema.compile(schema, use_formats=False)
+        validate(data)
         
         print("✅ Validation successful!")
         print(f"📊 Registry contains {data['total_count']} aerodromes")
@@ -35,7 +37,7 @@ def validate_aerodrome_data():
             
         # Check for duplicate ICAO codes
         icao_codes = [aerodrome['icao'] for aerodrome in data['aerodromes']]
-        duplicates = [code for code in set(icao_codes) if icao_codes.count(code) > 1]
+        duplicates = [code for code, count in Counter(icao_codes).items() if count > 1]
         if duplicates:
             print(f"⚠️  WARNING: Duplicate ICAO codes found: {duplicates}")
             return False
@@ -43,9 +45,9 @@ def validate_aerodrome_data():
         print("🎉 All validation checks passed!")
         return True
         
-    except ValidationError as e:
+    except JsonSchemaValueException as e:
         print(f"❌ Validation error: {e.message}")
-        print(f"📍 Path: {' -> '.join(str(x) for x in e.path)}")
+        print(f"📍 Path: {' -> '.join(str(x) for x in e.path[1:])}")
         return False
         
     except FileNotFoundError as e: